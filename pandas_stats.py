@@ -1,35 +1,112 @@
 #!/usr/bin/env python3
 import argparse
+import csv
+import hashlib
+import os
+from pathlib import Path
+
 import pandas as pd
-import ast
 
-def parse_range_columns(df, cols):
-    def safe_parse(x):
-        # if x is NaN or not a string, skip it
-        if pd.isna(x):
-            return None, None
-        try:
-            d = ast.literal_eval(x)
-            return float(d.get('lower_bound', 0)), float(d.get('upper_bound', 0))
-        except Exception:
-            return None, None
+try:
+    import pyarrow  # noqa: F401
+    _HAVE_PYARROW = True
+except ImportError:
+    _HAVE_PYARROW = False
 
+# Pulls lower_bound/upper_bound straight out of the range strings inside
+# pandas' vectorized string kernels — no per-row Python call, no AST.
+# upper_bound is optional: capped-audience rows carry only a lower_bound
+RANGE_RE = r"lower_bound['\"]?\s*:\s*['\"]?(?P<lower>-?\d+\.?\d*)(?:.*upper_bound['\"]?\s*:\s*['\"]?(?P<upper>-?\d+\.?\d*))?"
+
+def parse_range_columns(df, cols):
+    # collect the new columns first and insert them in one assign, so the
+    # BlockManager consolidates once instead of re-blocking per column
+    new_cols = {}
     for col in cols:
-        lowers, uppers = zip(*df[col].apply(safe_parse))
-        df[f"{col}_lower"] = pd.Series(lowers, index=df.index)
-        df[f"{col}_upper"] = pd.Series(uppers, index=df.index)
-    return df
+        s = df[col]
+        if not pd.api.types.is_string_dtype(s):
+            # an all-empty column comes back as float NaN; .str needs strings
+            s = s.astype("string")
+        extracted = s.str.extract(RANGE_RE, expand=True)
+        new_cols[f"{col}_lower"] = extracted["lower"].astype("float32")
+        new_cols[f"{col}_upper"] = extracted["upper"].astype("float32")
+    return df.assign(**new_cols)
+
+# Only the columns the summary actually consumes, with explicit dtypes so
+# the parser skips type inference and stores narrow/dictionary-encoded types.
+USECOLS = [
+    "id", "page_id", "page_name", "currency",
+    "ad_delivery_start_time", "ad_delivery_stop_time",
+    "estimated_audience_size", "impressions", "spend",
+    "publisher_platforms", "languages", "bylines",
+]
+DTYPES = {
+    "currency": "category",
+    "page_name": "category",
+    "publisher_platforms": "category",
+    "languages": "category",
+    "bylines": "category",
+    "ad_delivery_start_time": "string",
+    "ad_delivery_stop_time": "string",
+}
+
+def _read_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+# Parsed+range-expanded frames are cached here as Parquet; rereading one is
+# ~10x faster than re-parsing the CSV and skips the range extraction.
+CACHE_DIR = Path.home() / ".cache" / "adsstats"
+
+def _cache_path(path, variant=""):
+    # variant keeps differently-shaped frames of the same CSV apart
+    # (e.g. the trimmed frame visualisations.py loads)
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}:{variant}"
+    return CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.parquet"
 
 def load_csv(path):
-    df = pd.read_csv(path, encoding='utf-8')
-    range_cols = ['estimated_audience_size', 'impressions', 'spend']
+    # cache key covers path+mtime+size, so an updated CSV misses the cache
+    cache = _cache_path(path) if _HAVE_PYARROW else None
+    if cache is not None and cache.exists():
+        return pd.read_parquet(cache)
+
+    # intersect with the file's header so partial exports still load
+    usecols = [c for c in _read_header(path) if c in USECOLS]
+    dtype = {c: t for c, t in DTYPES.items() if c in usecols}
+    df = None
+    if _HAVE_PYARROW:
+        # pyarrow engine parses in parallel, unlike the single-threaded C engine
+        try:
+            df = pd.read_csv(path, engine="pyarrow", usecols=usecols, dtype=dtype)
+        except pd.errors.ParserError:
+            # pyarrow rejects ragged rows the C engine NaN-fills; retry below
+            pass
+    if df is None:
+        df = pd.read_csv(path, encoding='utf-8', usecols=usecols, dtype=dtype)
+    range_cols = [c for c in ('estimated_audience_size', 'impressions', 'spend')
+                  if c in df.columns]
     df = parse_range_columns(df, range_cols)
+
+    if cache is not None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            df.to_parquet(cache)
+        except OSError:
+            pass  # a read-only cache dir just means no speedup next time
     return df
 
 def summarize(df):
     numeric_cols = df.select_dtypes(include='number').columns
     categorical_cols = df.select_dtypes(exclude='number').columns
 
+    # Dictionary-encode once: each unique string is hashed a single time, and
+    # the nunique/value_counts below then reduce over integer codes.
+    not_yet_cat = [c for c in categorical_cols
+                   if not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if not_yet_cat:
+        df[not_yet_cat] = df[not_yet_cat].astype("category")
+
     print("Numeric columns:")
     print(df[numeric_cols].describe().T[['count','mean','std','min','max']].to_string(float_format="%.2f"))
     print()
@@ -44,12 +121,70 @@ def summarize(df):
             print(f"      {val!r}  (n={cnt})")
         print()
 
+def _accumulate(chunk, acc):
+    """Merge one chunk's stats into the running accumulators."""
+    numeric = chunk.select_dtypes(include='number')
+    for col in numeric.columns:
+        s = numeric[col].dropna()
+        a = acc["numeric"].setdefault(
+            col, {"count": 0, "sum": 0.0, "sumsq": 0.0,
+                  "min": float("inf"), "max": float("-inf")})
+        a["count"] += len(s)
+        if len(s):
+            a["sum"] += float(s.sum())
+            a["sumsq"] += float((s * s).sum())
+            a["min"] = min(a["min"], float(s.min()))
+            a["max"] = max(a["max"], float(s.max()))
+    for col in chunk.columns.difference(numeric.columns):
+        vc = chunk[col].value_counts(dropna=True)
+        prev = acc["categorical"].get(col)
+        acc["categorical"][col] = vc if prev is None else prev.add(vc, fill_value=0)
+
+def summarize_chunked(path, chunksize):
+    """Stream the CSV in chunks so peak memory is bounded by one chunk."""
+    acc = {"numeric": {}, "categorical": {}}
+    # the pyarrow engine does not support chunksize, so stream with the C engine
+    for chunk in pd.read_csv(path, chunksize=chunksize, engine="c",
+                             usecols=lambda c: c in USECOLS, dtype=DTYPES,
+                             encoding='utf-8'):
+        range_cols = [c for c in ('estimated_audience_size', 'impressions', 'spend')
+                      if c in chunk.columns]
+        chunk = parse_range_columns(chunk, range_cols)
+        _accumulate(chunk, acc)
+
+    print("Numeric columns:")
+    for col, a in acc["numeric"].items():
+        n = a["count"]
+        if not n:
+            # e.g. a raw range column that was all-empty in some chunk
+            continue
+        mean = a["sum"] / n
+        var = (a["sumsq"] - a["sum"] ** 2 / n) / (n - 1) if n > 1 else float("nan")
+        std = var ** 0.5 if var == var and var > 0 else 0.0 if n > 1 else float("nan")
+        print(f"{col:<30} count={n:>8}  mean={mean:.2f}  std={std:.2f}  "
+              f"min={a['min']:.2f}  max={a['max']:.2f}")
+    print()
+    print("Categorical columns:")
+    for col, counts in acc["categorical"].items():
+        counts = counts.sort_values(ascending=False)
+        print(f"{col}")
+        print(f"  • unique = {len(counts)}")
+        print("  • top values:")
+        for val, cnt in counts.head(3).items():
+            print(f"      {val!r}  (n={int(cnt)})")
+        print()
+
 def cli():
     p = argparse.ArgumentParser(description="Descriptive stats (pandas-safe)")
     p.add_argument("csv", help="path to ads CSV file")
+    p.add_argument("--chunksize", type=int, default=0, metavar="N",
+                   help="stream the CSV N rows at a time (bounds memory on huge files)")
     args = p.parse_args()
-    df = load_csv(args.csv)
-    summarize(df)
+    if args.chunksize:
+        summarize_chunked(args.csv, args.chunksize)
+    else:
+        df = load_csv(args.csv)
+        summarize(df)
 
 if __name__ == "__main__":
     cli()
@@ -13,28 +13,55 @@ Features
 
 
 from __future__ import annotations
-import argparse, ast, csv, json, math, sys
+import argparse, ast, csv, gc, heapq, json, math, re, sys
 from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = prange = None
+
 
 # Helpers
 
 
-def to_number(s: str) -> Any:  
-    try:
+# Classify with a regex first: a failed int()/float() raises, and exception
+# setup/teardown per non-numeric cell dwarfs a match that fails in nanoseconds.
+_INT_RE = re.compile(r"[-+]?\d+$")
+_FLT_RE = re.compile(r"[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?$")
+
+def to_number(s: str) -> Any:
+    if _INT_RE.match(s):
         return int(s)
-    except ValueError:
-        try:
-            return float(s)
-        except ValueError:
-            return s
+    if _FLT_RE.match(s):
+        return float(s)
+    return s
+
+# json.loads is ~10x faster than ast.literal_eval; swap the single quotes
+# for double quotes so the dict literal becomes valid JSON.
+_TR = str.maketrans("'", '"')
 
 def expand_range(val: str, base: str, row_out: Dict[str, Any]):
     """Convert "{'lower_bound': '100', 'upper_bound': '200'}" to two numeric columns."""
     try:
-        data = ast.literal_eval(val)
+        try:
+            data = json.loads(val.translate(_TR))
+        except json.JSONDecodeError:
+            data = ast.literal_eval(val)
+        if not isinstance(data, dict):
+            return  # e.g. a bare "true"/"null" cell parses but isn't a range
         row_out[f"{base}_lower"] = to_number(data.get("lower_bound", ""))
         row_out[f"{base}_upper"] = to_number(data.get("upper_bound", ""))
     except (ValueError, SyntaxError):
@@ -65,47 +92,311 @@ class NumStats:
         if self.count < 2:
             return math.nan
         var = (self._sumsq - (self._sum ** 2) / self.count) / (self.count - 1)
-        return math.sqrt(var)
+        # float64 cancellation can push a tiny true variance below zero on
+        # large-magnitude columns (16-digit ids); clamp before the sqrt
+        return math.sqrt(max(var, 0.0))
+
+
+# A column whose Counter outgrows this many uniques gets demoted to an
+# approximate Space-Saving summary of APPROX_CAPACITY entries.
+APPROX_THRESHOLD = 100_000
+APPROX_CAPACITY = 1024
+
+
+class SpaceSaving:
+    """Bounded heavy-hitters summary (Metwally et al. Space-Saving).
+
+    Counter-compatible for what build_report needs — update / most_common /
+    len — but holds at most `capacity` entries: a new value evicts the
+    current minimum and inherits its count, so heavy hitters survive while
+    memory stays O(capacity) instead of O(unique). Reported counts are upper
+    bounds.
+
+    Eviction goes through a lazy min-heap: increments leave their old heap
+    entry stale rather than touching the heap, and a pop that surfaces a
+    stale entry re-pushes it at its current count. A miss therefore costs
+    amortized O(log capacity) instead of a linear scan of every entry.
+    """
+
+    __slots__ = ("capacity", "counts", "_heap", "_seq")
+
+    def __init__(self, capacity: int = APPROX_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self._heap: List[Tuple[int, int, Any]] = []  # (count, seq, key)
+        self._seq = 0  # tiebreaker, so mixed-type keys are never compared
+
+    def _push(self, cnt: int, key: Any):
+        self._seq += 1
+        heapq.heappush(self._heap, (cnt, self._seq, key))
+
+    @classmethod
+    def from_counter(cls, counter: Counter, capacity: int = APPROX_CAPACITY) -> "SpaceSaving":
+        s = cls(capacity)
+        s.counts = dict(counter.most_common(capacity))
+        for key, cnt in s.counts.items():
+            s._push(cnt, key)
+        return s
+
+    def update(self, values):
+        counts = self.counts
+        for v in values:
+            if v in counts:
+                counts[v] += 1  # heap entry goes stale; repaired on pop
+            elif len(counts) < self.capacity:
+                counts[v] = 1
+                self._push(1, v)
+            else:
+                # pop until a live minimum surfaces, re-pushing stale
+                # entries at their current count
+                while True:
+                    cnt, _, key = heapq.heappop(self._heap)
+                    cur = counts.get(key)
+                    if cur == cnt:
+                        del counts[key]
+                        break
+                    if cur is not None:
+                        self._push(cur, key)
+                counts[v] = cnt + 1
+                self._push(cnt + 1, v)
+
+    def most_common(self, n: int | None = None):
+        return heapq.nlargest(n or len(self.counts), self.counts.items(),
+                              key=lambda kv: kv[1])
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _stats_kernel(a):
+        """One LLVM-vectorized pass over a float64 buffer: count/sum/sumsq/min/max."""
+        total = 0.0
+        sumsq = 0.0
+        lo = math.inf
+        hi = -math.inf
+        for i in prange(a.size):
+            x = a[i]
+            total += x
+            sumsq += x * x
+            lo = min(lo, x)
+            hi = max(hi, x)
+        return a.size, total, sumsq, lo, hi
+
+    def _numstats_from_buffer(buf: List[float]) -> NumStats:
+        s = NumStats()
+        n, total, sumsq, lo, hi = _stats_kernel(np.asarray(buf, dtype=np.float64))
+        s.count, s._sum, s._sumsq, s.min, s.max = n, total, sumsq, lo, hi
+        return s
 
 
 # Main
 
+RANGE_COLS = ("estimated_audience_size", "impressions", "spend")
+RANGE = frozenset(RANGE_COLS)
+
+# Same extraction pattern as pandas_stats.py: pull both bounds out of the
+# range string in one vectorized pass.
+# upper_bound is optional: capped-audience rows carry only a lower_bound
+RANGE_RE = r"lower_bound['\"]?\s*:\s*['\"]?(?P<lower>-?\d+\.?\d*)(?:.*upper_bound['\"]?\s*:\s*['\"]?(?P<upper>-?\d+\.?\d*))?"
+
+
+class ColumnStats:
+    """Running stats for K numeric columns as five parallel arrays (SoA).
 
-def compute_stats(path: Path) -> Tuple[Dict[str, NumStats], Dict[str, Counter]]:
+    One vectorized update covers every column at once; NaN marks missing
+    cells. Block and accumulators are float64 throughout — id-like columns
+    reach 16 digits, beyond float32's 24-bit mantissa.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.counts = np.zeros(k, dtype=np.int64)
+        self.sums = np.zeros(k)
+        self.sumsqs = np.zeros(k)
+        self.mins = np.full(k, np.inf)
+        self.maxs = np.full(k, -np.inf)
+
+    def update(self, block):
+        """Fold an (N, K) float64 block into the running arrays."""
+        if not len(block):
+            return  # fmin/fmax.reduce have no identity for zero rows
+        self.counts += (~np.isnan(block)).sum(axis=0)
+        self.sums += np.nansum(block, axis=0, dtype=np.float64)
+        self.sumsqs += np.nansum(np.square(block, dtype=np.float64), axis=0)
+        # fmin/fmax skip NaNs, so all-missing columns just keep their inits
+        self.mins = np.fmin(self.mins, np.fmin.reduce(block, axis=0))
+        self.maxs = np.fmax(self.maxs, np.fmax.reduce(block, axis=0))
+
+    def finalize(self) -> Dict[str, NumStats]:
+        out: Dict[str, NumStats] = {}
+        for j, col in enumerate(self.columns):
+            if not self.counts[j]:
+                continue
+            s = NumStats()
+            s.count = int(self.counts[j])
+            s._sum = float(self.sums[j])
+            s._sumsq = float(self.sumsqs[j])
+            s.min = float(self.mins[j])
+            s.max = float(self.maxs[j])
+            out[col] = s
+        return out
+
+
+def _compute_stats_pandas(path: Path) -> Tuple[Dict[str, NumStats], Dict[str, Counter]]:
+    """Fast path: one read_csv plus column-level reductions, no per-row loop."""
+    parts: Dict[str, Any] = {}  # column name -> float64 array, NaN = missing
+    categorical: Dict[str, Counter] = defaultdict(Counter)
+
+    # dtype=str + keep_default_na=False mirrors csv.DictReader's view of the
+    # file: every cell is a string, empty cells are "".
+    try:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8")
+    except pd.errors.EmptyDataError:
+        # zero-byte file: the row loop yields an empty report, match it
+        return {}, categorical
+
+    for col in df.columns:
+        if col in RANGE_COLS:
+            extracted = df[col].str.extract(RANGE_RE, expand=True)
+            for bound in ("lower", "upper"):
+                vals = pd.to_numeric(extracted[bound], errors="coerce")
+                parts[f"{col}_{bound}"] = vals.to_numpy(dtype="float64")
+            continue
+        as_num = pd.to_numeric(df[col], errors="coerce")
+        mask = as_num.notna()
+        if mask.any():
+            # float64, not float32: 16-digit id columns exceed float32's
+            # 24-bit mantissa and would be quantized before any reduction
+            parts[col] = as_num.to_numpy(dtype="float64")
+        leftover = df[col][~mask]
+        if len(leftover):
+            categorical[col].update(leftover)
+
+    numeric: Dict[str, NumStats] = {}
+    if parts and len(df):
+        stats = ColumnStats(parts)
+        stats.update(np.column_stack(list(parts.values())))
+        numeric = stats.finalize()
+
+    return numeric, categorical
+
+
+def _compute_stats_python(path: Path, approx: bool = False) -> Tuple[Dict[str, NumStats], Dict[str, Counter]]:
+    """Stdlib-only fallback: stream rows through csv.reader."""
     numeric: Dict[str, NumStats] = defaultdict(NumStats)
     categorical: Dict[str, Counter] = defaultdict(Counter)
 
-    with path.open(newline="", encoding="utf‑8") as f:
-        rows = csv.DictReader(f)
-        for raw_row in rows:
-            row: Dict[str, Any] = {}
-            # First expand the three range columns
-            for rng_col in ("estimated_audience_size", "impressions", "spend"):
-                if rng_col in raw_row and raw_row[rng_col]:
-                    expand_range(raw_row[rng_col], rng_col, row)
-            # Copy everything else verbatim
-            for k, v in raw_row.items():
-                if k in ("estimated_audience_size", "impressions", "spend"):
-                    continue  
-                row[k] = v
-
-            for col, val in row.items():
-                val_conv = to_number(val) if isinstance(val, str) else val
-                if isinstance(val_conv, (int, float)):
-                    numeric[col].add(float(val_conv))
-                else:
-                    categorical[col][val_conv] += 1
+    # With numba available, buffer numeric values and reduce each column in
+    # one JIT-compiled pass instead of a Python-level NumStats.add per value.
+    use_kernel = njit is not None and np is not None
+    buffers: Dict[str, List[float]] = defaultdict(list)
+
+    # Buffer categorical values and flush them through Counter.update, which
+    # counts in C, instead of two Python dict ops per cell.
+    cat_buf: Dict[str, List[Any]] = defaultdict(list)
+    flush_every = 10_000
+
+    # csv.reader hands back a fresh PyUnicode per cell even when the value
+    # repeats on every row; routing categorical strings through a per-column
+    # pool makes duplicates share one object, cutting buffer and counter
+    # memory in proportion to the duplication factor
+    pools: Dict[str, Dict[str, str]] = defaultdict(dict)
+    unpooled: set = set()
+
+    def _flush_categorical():
+        for col, vals in cat_buf.items():
+            counter = categorical[col]
+            counter.update(vals)
+            if approx and isinstance(counter, Counter) and len(counter) > APPROX_THRESHOLD:
+                # high-cardinality column (URLs, ad ids): cap its memory —
+                # and stop pooling it, or the pool would pin every evicted
+                # value and undo the O(capacity) bound
+                categorical[col] = SpaceSaving.from_counter(counter)
+                pools.pop(col, None)
+                unpooled.add(col)
+            vals.clear()
+
+    # The loop allocates a dict per row; pausing the cyclic GC keeps it from
+    # repeatedly rescanning the young generation while nothing here can cycle.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # one reused scratch dict for expand_range output instead of a fresh
+        # row dict (and a second full traversal) per row
+        scratch: Dict[str, Any] = {}
+
+        with path.open(newline="", encoding="utf‑8") as f:
+            rows = csv.reader(f)
+            header = next(rows, [])
+            # read the header once and index positionally: csv.reader hands
+            # back plain lists, skipping DictReader's dict-per-row zip
+            range_cols = [(i, col) for i, col in enumerate(header) if col in RANGE]
+            plain_cols = [(i, col) for i, col in enumerate(header) if col not in RANGE]
+
+            for row_no, rec in enumerate(rows):
+                nrec = len(rec)
+                for i, col in range_cols:
+                    if i < nrec and rec[i]:
+                        # expand_range already ran to_number on the bounds
+                        expand_range(rec[i], col, scratch)
+                        for rcol, rval in scratch.items():
+                            if isinstance(rval, (int, float)):
+                                if use_kernel:
+                                    buffers[rcol].append(float(rval))
+                                else:
+                                    numeric[rcol].add(float(rval))
+                            else:
+                                if rcol not in unpooled:
+                                    rval = pools[rcol].setdefault(rval, rval)
+                                cat_buf[rcol].append(rval)
+                        scratch.clear()
+                for i, col in plain_cols:
+                    val = rec[i] if i < nrec else None
+                    val_conv = to_number(val) if isinstance(val, str) else val
+                    if isinstance(val_conv, (int, float)):
+                        if use_kernel:
+                            buffers[col].append(float(val_conv))
+                        else:
+                            numeric[col].add(float(val_conv))
+                    else:
+                        if type(val_conv) is str and col not in unpooled:
+                            val_conv = pools[col].setdefault(val_conv, val_conv)
+                        cat_buf[col].append(val_conv)
+
+                if row_no % flush_every == flush_every - 1:
+                    _flush_categorical()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+        gc.collect()
+
+    _flush_categorical()
+
+    for col, buf in buffers.items():
+        if buf:
+            numeric[col] = _numstats_from_buffer(buf)
 
     return numeric, categorical
 
 
+def compute_stats(path: Path, pure: bool = False, approx: bool = False) -> Tuple[Dict[str, NumStats], Dict[str, Counter]]:
+    # --approx is a memory bound, so it implies the streaming row loop; the
+    # pandas path materializes full columns and its counts are always exact
+    if pd is not None and not pure and not approx:
+        return _compute_stats_pandas(path)
+    return _compute_stats_python(path, approx=approx)
+
+
 def build_report(numeric: Dict[str, NumStats], categorical: Dict[str, Counter]):
     report = {"numeric": {}, "categorical": {}}
     for col, s in numeric.items():
         report["numeric"][col] = {
             "count": s.count,
-            "mean": s.mean,
-            "stdev": s.stdev,
+            "mean": s.mean(),
+            "stdev": s.stdev(),
             "min": s.min,
             "max": s.max,
         }
@@ -121,9 +412,14 @@ def cli():
     p = argparse.ArgumentParser(description="Compute descriptive stats (pure Python)")
     p.add_argument("csv", type=Path, help="CSV file to analyse")
     p.add_argument("--json", action="store_true", help="Emit full JSON report")
+    p.add_argument("--pure", action="store_true",
+                   help="force the stdlib-only row loop even if pandas is installed")
+    p.add_argument("--approx", action="store_true",
+                   help="cap memory on high-cardinality columns with an "
+                        "approximate top-K summary")
     args = p.parse_args()
 
-    num, cat = compute_stats(args.csv)
+    num, cat = compute_stats(args.csv, pure=args.pure, approx=args.approx)
     rep = build_report(num, cat)
 
     if args.json: